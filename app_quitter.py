@@ -47,13 +47,13 @@ import sys
 import subprocess
 import os
 import time
-import glob
 import plistlib
+import atexit
 
-from Cocoa import NSRunningApplication
-from AppKit import NSWorkspace
+from AppKit import NSRunningApplication, NSWorkspace, NSWorkspaceApplicationKey, NSWorkspaceDidTerminateApplicationNotification
+from CoreFoundation import CFRunLoopGetCurrent, CFRunLoopRunInMode, CFRunLoopStop, kCFRunLoopDefaultMode, kCFRunLoopRunFinished
 from threading import Timer
-from datetime import datetime, timedelta
+from datetime import date
 
 """
 Input parameters from jamf:
@@ -69,6 +69,8 @@ APPS = sys.argv[4].split(",")
 PROMPT = sys.argv[5].lower() == 'true'
 APP_NAME = sys.argv[6]
 POLICY_EVENT = sys.argv[7]
+# policy event with spaces removed, for use in file names and daemon labels
+POLICY_EVENT_KEY = POLICY_EVENT.replace(" ", "")
 FORCE_QUIT = sys.argv[8].lower() == 'true'
 DEFER_POLICY_EVENT = sys.argv[9]
 DEFER_LIMIT = int(sys.argv[10]) or 14
@@ -79,8 +81,24 @@ VERSION = sys.argv[11]
 orgName = ''
 # path to your org's icon (not required)
 iconPath = '/path/to/your/icon.png'
+# icon to use for user dialogs, falling back to a system icon if the org icon isn't present
+_ICON = iconPath if os.path.exists(iconPath) else "/System/Library/CoreServices/Problem Reporter.app/Contents/Resources/ProblemReporter.icns"
+# jamfHelper arguments shared by every user dialog
+_JAMFHELPER_BASE = (
+	"/Library/Application Support/JAMF/bin/jamfHelper.app/Contents/MacOS/jamfHelper",
+	"-windowType",
+	"utility",
+	"-title",
+	"Managed App Update",
+	"-icon",
+	_ICON,
+	"-button1",
+	"OK",
+)
+# deferral periods (in seconds) offered to the user when deferrals are available
+_DELAY_OPTS = ("-showDelayOptions", "0, 600, 1200, 3600, 10800, 86400, 172800")
 # current date
-date_today = datetime.date(datetime.now())
+date_today = date.today()
 # blue heart emoji for user dialogs
 SYMBOL = b'\xf0\x9f\x92\x99'
 # message to prompt the user to quit and update an app
@@ -138,19 +156,73 @@ COMPLETE = """Thank You!
 	APP_NAME
 )
 
+# plists read or written during this run, keyed by path
+_plist_cache = {}
+# paths in _plist_cache that have changed and still need to be written to disk
+_dirty = set()
+
 # start functions
 
 def load_plist(plist_path):
-	# Load and return data from a plist
-	with open(plist_path, 'rb') as plist:
-		plist_data = plistlib.load(plist)
+	# Load and return data from a plist, reading each file from disk at most once per run
+	if plist_path not in _plist_cache:
+		with open(plist_path, 'rb') as plist:
+			_plist_cache[plist_path] = plistlib.load(plist)
 	
-	return plist_data
+	return _plist_cache[plist_path]
 
 def dump_plist(plist_data, plist_path):
-	# Dump data into a plist
-	with open(plist_path, 'wb') as plist:
-		plistlib.dump(plist_data, plist)
+	# Stage data for a plist, which is written to disk by flush_plists
+	_plist_cache[plist_path] = plist_data
+	_dirty.add(plist_path)
+
+def plist_exists(plist_path):
+	# Check for a plist either staged in the cache or already on disk
+	return plist_path in _plist_cache or os.path.exists(plist_path)
+
+def remove_plist(plist_path):
+	# Delete a plist from disk and drop any staged data so it isn't written back out
+	_plist_cache.pop(plist_path, None)
+	_dirty.discard(plist_path)
+	if os.path.exists(plist_path):
+		os.remove(plist_path)
+
+@atexit.register
+def flush_plists():
+	"""
+	Write any plists changed during this run out to disk
+	
+	This runs automatically when the script exits, but can be called early when another process needs to read a plist right away
+	"""
+	while _dirty:
+		plist_path = _dirty.pop()
+		write_plist(_plist_cache[plist_path], plist_path)
+
+def write_plist(plist_data, plist_path):
+	"""
+	Serialize a plist and write it to disk with a single write call
+	
+	The data is written to a hidden temporary file next to the destination and renamed into place
+	This keeps launchd from ever reading a partially written LaunchDaemon
+	If the write comes up short or fails, the temporary file is removed and the destination is left untouched
+	"""
+	data = plistlib.dumps(plist_data)
+	directory, name = os.path.split(plist_path)
+	tmp_path = os.path.join(directory, ".{}.tmp".format(name))
+	try:
+		fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+		try:
+			written = os.write(fd, data)
+		finally:
+			os.close(fd)
+		if written != len(data):
+			raise OSError("Short write to {}: {} of {} bytes".format(tmp_path, written, len(data)))
+		os.rename(tmp_path, plist_path)
+	except OSError:
+		# Don't leave a stray temporary file behind in LaunchDaemons or Application Support
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+		raise
 
 def check_install_date():
 	"""
@@ -160,12 +232,12 @@ def check_install_date():
 	Either way, this check can be skipped if the file isn't there to read
 	If more than 120 days have passed since the last update, exhaust all deferrals and force the update now
 	"""
-	if not os.path.exists(receipt_file):
+	if not plist_exists(receipt_file):
 		return
 		
 	install_data = load_plist(receipt_file)
 
-	last_install_date = datetime.strptime(install_data[POLICY_EVENT], '%Y-%m-%d').date()
+	last_install_date = date.fromisoformat(install_data[POLICY_EVENT])
 	delta = date_today - last_install_date
 	print(f"This app was last updated on {last_install_date}, which was {delta.days} days ago.")
 	if delta.days > 120:
@@ -180,14 +252,14 @@ def write_install_date():
 	This will be checked by check_install_date on future runs to enforce the SLA
 	"""
 	install_data = {
-		POLICY_EVENT : str(date_today),
+		POLICY_EVENT : date_today.isoformat(),
 	}
 	
 	dump_plist(install_data, receipt_file)
 
 # return bundle ID if the app is running
 def get_app(bid):
-	return next((a for a in NSRunningApplication.runningApplicationsWithBundleIdentifier_(bid)), None)
+	return NSRunningApplication.runningApplicationsWithBundleIdentifier_(bid).firstObject()
 
 def check_if_running(bid):
 	"""
@@ -195,8 +267,7 @@ def check_if_running(bid):
 	
 	Return a boolean value based on the result
 	"""
-	app = get_app(bid)
-	return bool(app)
+	return NSRunningApplication.runningApplicationsWithBundleIdentifier_(bid).count() > 0
 
 def remove_daemons(policy_event):
 	"""
@@ -206,7 +277,9 @@ def remove_daemons(policy_event):
 	It will need to be unloaded and deleted before the script exits
 	Otherwise, it will be loaded again next time the device restarts and the user will get an erroneous update prompt
 	"""
-	daemon_files = glob.glob("/Library/LaunchDaemons/com.appUpdates.policydefer.*.{}.plist".format(policy_event.replace(" ", "")))
+	prefix = "com.appUpdates.policydefer."
+	suffix = ".{}.plist".format(policy_event)
+	daemon_files = [entry.path for entry in os.scandir("/Library/LaunchDaemons") if entry.name.startswith(prefix) and entry.name.endswith(suffix)]
 	
 	for daemon in daemon_files:
 		try:
@@ -223,10 +296,10 @@ def set_deferral(deferral_period, policy_event):
 	This function will delete all daemons for the app trying to update before creating the new one
 	"""
 	
-	remove_daemons(POLICY_EVENT)
+	remove_daemons(policy_event)
 	
 	daemon_time = int(time.time())
-	daemon_label = "com.appUpdates.policydefer.{}.{}".format(daemon_time, policy_event.replace(" ", ""))
+	daemon_label = "com.appUpdates.policydefer.{}.{}".format(daemon_time, policy_event)
 	daemon_file = "/Library/LaunchDaemons/{}.plist".format(daemon_label)
 
 	cmd = [
@@ -249,9 +322,10 @@ def set_deferral(deferral_period, policy_event):
 	}
 	
 	dump_plist(daemon_data, daemon_file)
+	# launchctl reads the daemon from disk, so it can't wait until exit to be written
+	flush_plists()
 	
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	_, err = proc.communicate()
+	_, err = spawn(cmd)
 	
 	if err:
 		print("Error: %s" % err)
@@ -277,12 +351,12 @@ def check_deferral_count():
 		os.makedirs(defer_path)
 	
 	global defer_file
-	defer_file = os.path.join(defer_path, "policydefer_{}.plist".format(POLICY_EVENT.replace(" ", "")))
+	defer_file = os.path.join(defer_path, "policydefer_{}.plist".format(POLICY_EVENT_KEY))
 	
-	if not os.path.exists(defer_file):
+	if not plist_exists(defer_file):
 		limit_value = {
 			"limit" : DEFER_LIMIT,
-			"used" : "0",
+			"used" : 0,
 		}
 		
 		dump_plist(limit_value, defer_file)
@@ -290,20 +364,22 @@ def check_deferral_count():
 	global defer_count
 
 	defer_count = load_plist(defer_file)
+	# Older deferral files stored the used count as a string, so convert it once here
+	defer_count['used'] = int(defer_count.get('used', 0))
 
-	if int(defer_count['used']) >= int(DEFER_LIMIT):
+	if defer_count['used'] >= DEFER_LIMIT:
 		print("All deferrals used")
 		return False
 	else:
 		print("{} deferrals have been used".format(defer_count['used']))
-		defer_message(int(DEFER_LIMIT) - int(defer_count['used']))
+		defer_message(DEFER_LIMIT - defer_count['used'])
 		return True
 
 def user_prompt(prompt=None, bid=None, reopen_app=False):
 	"""
 	Prompt the user to update an application
 	
-	Build the cmd to call jamfHelper
+	Build the cmd to call jamfHelper from the shared base arguments
 	Set the prompt to let the user know about their deferral options, and add options to the prompt if available
 	If all deferrals have been used, change the prompt to offer no deferrals
 	Use jamfHelper to generate a dialog for the user
@@ -319,28 +395,14 @@ def user_prompt(prompt=None, bid=None, reopen_app=False):
 	If the update is being forced, or the update is complete and the user is being asked if they want to re-launch the updated app, the return value from this function is not needed and ignored
 	"""
 	
-	icon = iconPath
-	if not os.path.exists(icon):
-		icon = "/System/Library/CoreServices/Problem Reporter.app/Contents/Resources/ProblemReporter.icns"
-		
-	cmd = [
-		"/Library/Application Support/JAMF/bin/jamfHelper.app/Contents/MacOS/jamfHelper",
-		"-windowType",
-		"utility",
-		"-title",
-		"Managed App Update",
-		"-icon",
-		icon,
-		"-button1",
-		"OK",
-	]
+	cmd = list(_JAMFHELPER_BASE)
 	
 	if reopen_app:
 		cmd.extend(["-button2", "Cancel", "-defaultButton", "1", "-timeout", "60",])
 	else:
 		if check_deferral_count():
 			prompt = DEFER_MESSAGE
-			cmd.extend(["-showDelayOptions", '"0, 600, 1200, 3600, 10800, 86400, 172800"'])
+			cmd.extend(_DELAY_OPTS)
 		else:
 			prompt = MESSAGE
 			
@@ -373,7 +435,7 @@ def user_prompt(prompt=None, bid=None, reopen_app=False):
 	except(ValueError, IndexError) as err:
 		print("jamfHelper exit code could not be parsed: " + str(err))
 		print("Deferring for one hour...")
-		set_deferral(3600, POLICY_EVENT)
+		set_deferral(3600, POLICY_EVENT_KEY)
 		return False
 	
 	deferral_seconds = int(out[:-1]) if len(out) > 1 else 0
@@ -388,7 +450,7 @@ def user_prompt(prompt=None, bid=None, reopen_app=False):
 		# sys.exit(1)
 	if button_selected == 1 and exit_code != 1 and not reopen_app:
 		print("User elected to defer for " + str(deferral_seconds // 60) + " minutes")
-		used_count = int(defer_count['used']) + 1
+		used_count = defer_count['used'] + 1
 		counter = {
 			"limit" : DEFER_LIMIT,
 			"used" : used_count,
@@ -396,7 +458,7 @@ def user_prompt(prompt=None, bid=None, reopen_app=False):
 
 		dump_plist(counter, defer_file)
 
-		set_deferral(deferral_seconds, POLICY_EVENT)
+		set_deferral(deferral_seconds, POLICY_EVENT_KEY)
 		return False
 	elif proc.returncode == 0:
 		if reopen_app:
@@ -411,35 +473,102 @@ def user_prompt(prompt=None, bid=None, reopen_app=False):
 	else:
 		return False
 		
-def quit_application(bid, force=False):
+def quit_applications(bids, force=False):
 	"""
-	Quit the application to be updated if the update isn't being deferred or otherwise skipped
-	
-	If the app should be force-terminated (in the case of a forced update), kill it immediately
-	Otherwise, attempt to quit it gracefully
-	This function will loop once per second for 30 seconds monitoring whether or not the app is still running
-	If still running after 10 quit attempts, it switches to forced termination
+	Quit the applications to be updated if the update isn't being deferred or otherwise skipped
+	
+	If the apps should be force-terminated (in the case of a forced update), kill them immediately
+	Otherwise, attempt to quit them gracefully
+	All bundle IDs are asked to quit at the same time, so the total wait is bounded by the slowest app rather than the sum of them
+	Rather than polling, listen for app termination notifications and wake as soon as an app exits
+	NSRunningApplication only refreshes its state while the run loop is running, so the apps share the main thread's run loop instead of being quit from separate threads
+	If still running after 10 seconds, it switches to forced termination and waits up to another 20 seconds
 	"""
-	print('Terminating app {}'.format(bid))
+	apps = {}
 
-	for i in range(30):
+	def request_quit(bid, force):
+		# Look up the running app and ask it to quit, tracking it until it terminates
 		app = get_app(bid)
-
 		if not app or app.isTerminated():
 			print('{} is not running.'.format(bid))
-			break
-
+			apps.pop(bid, None)
+			return
 		if force:
 			app.forceTerminate()
 		else:
 			app.terminate()
+		apps[bid] = app
+
+	def wait_for_exit(timeout, force):
+		deadline = time.monotonic() + timeout
+		while apps:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				break
+			for bid in apps:
+				print('Waiting on {} to terminate'.format(bid))
+			if CFRunLoopRunInMode(kCFRunLoopDefaultMode, remaining, False) == kCFRunLoopRunFinished:
+				# The run loop had nothing to run, so the tracked apps' state hasn't refreshed
+				# Fall back to polling once per second with a fresh lookup of each bundle ID
+				time.sleep(min(1, remaining))
+				for bid in list(apps):
+					request_quit(bid, force)
+			else:
+				for bid, app in list(apps.items()):
+					if app.isTerminated():
+						# Another instance may share the bundle ID, so look it up again once this one has exited
+						request_quit(bid, force)
 
-		if i >= 10 and not app.isTerminated():
-			print('Terminating {} taking too long. Forcing terminate.'.format(bid))
-			app.forceTerminate()
+	def on_terminate(notification):
+		CFRunLoopStop(CFRunLoopGetCurrent())
+
+	center = NSWorkspace.sharedWorkspace().notificationCenter()
+	observer = center.addObserverForName_object_queue_usingBlock_(NSWorkspaceDidTerminateApplicationNotification, None, None, on_terminate)
+	try:
+		for bid in bids:
+			print('Terminating app {}'.format(bid))
+			request_quit(bid, force)
 
-		print('Waiting on {} to terminate'.format(bid))
-		time.sleep(1)
+		wait_for_exit(30 if force else 10, force)
+
+		if apps and not force:
+			for bid in list(apps):
+				print('Terminating {} taking too long. Forcing terminate.'.format(bid))
+				request_quit(bid, True)
+			wait_for_exit(20, True)
+	finally:
+		center.removeObserver_(observer)
+
+def spawn(cmd):
+	"""
+	Run a command with posix_spawn and wait for it to finish, discarding its output
+	
+	Return the exit code and anything written to stderr
+	"""
+	read_fd, write_fd = os.pipe()
+	try:
+		pid = os.posix_spawn(cmd[0], cmd, os.environ, file_actions=[
+			(os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+			(os.POSIX_SPAWN_DUP2, write_fd, 2),
+		])
+	except OSError:
+		os.close(read_fd)
+		raise
+	finally:
+		os.close(write_fd)
+	with os.fdopen(read_fd, 'rb') as stderr:
+		err = stderr.read()
+	_, status = os.waitpid(pid, 0)
+	return os.waitstatus_to_exitcode(status), err
+
+def run_jamf(*args):
+	"""
+	Call the jamf binary once with the given verb and arguments
+	Return the exit code and stderr from the jamf process
+	"""
+	cmd = ["/usr/local/bin/jamf"]
+	cmd.extend(args)
+	return spawn(cmd)
 
 def run_update_policy(event):
 	"""
@@ -447,42 +576,72 @@ def run_update_policy(event):
 	
 	This function accepts event as a trigger for a jamf policy to install an app package, such as 'autoupdate-Slack'
 	The jamf binary is called to explicitly run the policy with the specified event trigger
-	If the event trigger is empty, do nothing
+	If the event trigger is empty or "false", do nothing
 	"""
-	if not event:
+	if not event or event.lower() == "false":
 		return
-	defer_counter_file = "/Library/Application Support/appUpdates/policydefer_{}.plist".format(POLICY_EVENT.replace(" ", ""))
-	if os.path.exists(defer_counter_file):
+	defer_counter_file = "/Library/Application Support/appUpdates/policydefer_{}.plist".format(POLICY_EVENT_KEY)
+	if plist_exists(defer_counter_file):
 		print("Removing deferral counter file...")
-		os.remove(defer_counter_file)
+		remove_plist(defer_counter_file)
 	print("Calling jamf policy...")
-	cmd = ["/usr/local/bin/jamf", "policy", "-event", event]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	_, err = proc.communicate()
+	returncode, err = run_jamf("policy", "-event", event)
 	write_install_date()
-	if proc.returncode:
+	# The completion prompt can block for minutes, and atexit handlers don't run if the script is terminated by a signal
+	# Write the receipt now rather than risk losing it, at the cost of the deferred write
+	flush_plists()
+	if returncode:
 		print("Error: %s" % err)
 
+def is_zoom_call(app):
+	"""
+	Return True if the given NSRunningApplication is Zoom's CptHost, which only runs during an active call
+	"""
+	executable = app.executableURL()
+	return bool(executable) and executable.lastPathComponent() == "CptHost"
+
 def check_for_zoom():
 	"""
 	Check to see if the user is on an active Zoom call by looking for the CptHost process
 	
 	This is done to ensure we don't interrupt an active call with an update prompt
-	Loop every 30 seconds for up to 5 minutes in case a call is about to end and we can catch them right after
+	Wait for up to 5 minutes in case a call is about to end and we can catch them right after
+	Rather than polling, listen for app termination notifications and wake as soon as CptHost quits
+	The process list is still re-checked every 30 seconds in case a notification is missed
+	If the run loop can't be used to wait, pgrep is used to check the live process table instead
 	If CptHost is not running, continue
 	Otherwise, exit silently
 	"""
-	for i in range(10):
-		zoomprocess = subprocess.Popen('pgrep CptHost', shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-		zoompid, err = zoomprocess.communicate()
+	workspace = NSWorkspace.sharedWorkspace()
+	if not any(is_zoom_call(app) for app in workspace.runningApplications()):
+		return False
 
-		if i == 9 and zoompid:
-			return True
-		if not zoompid:
-			return False
-		else:
+	def on_terminate(notification):
+		if is_zoom_call(notification.userInfo()[NSWorkspaceApplicationKey]):
+			CFRunLoopStop(CFRunLoopGetCurrent())
+
+	center = workspace.notificationCenter()
+	observer = center.addObserverForName_object_queue_usingBlock_(NSWorkspaceDidTerminateApplicationNotification, None, None, on_terminate)
+	deadline = time.monotonic() + 300
+	try:
+		while True:
+			interval = min(30, max(0, deadline - time.monotonic()))
+			if interval <= 0:
+				break
 			print("User is in a Zoom call, waiting...")
-			time.sleep(30)
+			if CFRunLoopRunInMode(kCFRunLoopDefaultMode, interval, False) == kCFRunLoopRunFinished:
+				# The run loop had nothing to run, so runningApplications hasn't refreshed
+				# Fall back to checking the live process table instead
+				time.sleep(interval)
+				returncode, _ = spawn(["/usr/bin/pgrep", "CptHost"])
+				if returncode != 0:
+					return False
+			elif not any(is_zoom_call(app) for app in workspace.runningApplications()):
+				return False
+	finally:
+		center.removeObserver_(observer)
+
+	return True
 
 def check_version(bid):
 	"""
@@ -490,23 +649,21 @@ def check_version(bid):
 	If they match (such as if the user already updated), exit silently
 	"""
 
-	cmd = ["/usr/bin/mdfind", "kMDItemCFBundleIdentifier", "=", bid]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	appPath, err = proc.communicate()
-
-	plistPath=appPath.decode("utf-8").strip() + "/Contents/Info.plist"
-
-	cmd = ["/usr/bin/defaults", "read", plistPath, "CFBundleVersion"]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	bundleVersion, err = proc.communicate()
+	appURL = NSWorkspace.sharedWorkspace().URLForApplicationWithBundleIdentifier_(bid)
+	if not appURL:
+		return True
 
-	bundleVersionString=bundleVersion.decode("utf-8").strip()
+	plistPath = os.path.join(appURL.path(), "Contents/Info.plist")
 
-	cmd = ["/usr/bin/defaults", "read", plistPath, "CFBundleShortVersionString"]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	bundleShortVersion, err = proc.communicate()
+	try:
+		with open(plistPath, 'rb') as plist:
+			info = plistlib.load(plist)
+	except (OSError, plistlib.InvalidFileException) as err:
+		print("Unable to read app Info.plist: " + str(err))
+		return True
 
-	bundleShortVersionString=bundleShortVersion.decode("utf-8").strip()
+	bundleVersionString = str(info.get('CFBundleVersion', ''))
+	bundleShortVersionString = str(info.get('CFBundleShortVersionString', ''))
 
 	if VERSION != bundleVersionString and VERSION != bundleShortVersionString:
 		return True
@@ -517,19 +674,18 @@ def run_recon():
 	"""
 	Update inventory to jamf
 	"""
-	cmd = ["/usr/local/bin/jamf", "recon"]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	out, err = proc.communicate()
+	run_jamf("recon")
 
 def run():
 	"""
 	Main function
 	
 	Validate the path to be used for receipt files and set a global var for the file path
-	For each bundle ID specified as an input parameter from jamf, check if the app is running
-	If not running, update the app and exit
+	For each bundle ID specified as an input parameter from jamf, check if the app is already updated and collect the ones that are running
+	If none are running, update the app and exit
 	Otherwise, assuming the user is not in an active Zoom call, either force quit and update, or ask the user if they want to run the update
 	If the latter and the user opts to update, run the update policy and notify the user once complete
+	Every running bundle ID is quit, but the user is prompted and the update policy is called only once per run
 	If the script exits due to an active Zoom call, we'll set a one hour deferral, but not count against their deferral limit
 	"""
 	global receipt_path
@@ -538,41 +694,45 @@ def run():
 		os.makedirs(receipt_path)
 		
 	global receipt_file
-	receipt_file = os.path.join(receipt_path, "install_{}.plist".format(POLICY_EVENT.replace(" ", "")))
+	receipt_file = os.path.join(receipt_path, "install_{}.plist".format(POLICY_EVENT_KEY))
 	
+	running_bids = []
 	for bid in APPS:
 		if not check_version(bid):
 			print("App already updated, exiting...")
-			remove_daemons(POLICY_EVENT)
+			remove_daemons(POLICY_EVENT_KEY)
 			run_recon()
 			sys.exit(0)
-		if not check_if_running(bid):
-			print("App not running")
-			run_update_policy(POLICY_EVENT)
-			remove_daemons(POLICY_EVENT)
-			sys.exit(0)
-		else:
-			check_install_date()
-			if FORCE_QUIT:
-				print("Notifying user and force quitting for emergency patch...")
-				user_prompt(FORCE_MSG)
-				quit_application(bid, force=True)
+		if check_if_running(bid):
+			running_bids.append(bid)
+
+	if not running_bids:
+		print("App not running")
+		run_update_policy(POLICY_EVENT)
+		remove_daemons(POLICY_EVENT_KEY)
+		sys.exit(0)
+
+	check_install_date()
+	if FORCE_QUIT:
+		print("Notifying user and force quitting for emergency patch...")
+		user_prompt(FORCE_MSG)
+		quit_applications(running_bids, force=True)
+	else:
+		if not check_for_zoom():
+			print("No Zoom calls active, prompting user to update...")
+			if user_prompt() or not PROMPT:
+				quit_applications(running_bids)
 			else:
-				if not check_for_zoom():
-					print("No Zoom calls active, prompting user to update...")
-					if user_prompt() or not PROMPT:
-						quit_application(bid)
-					else:
-						print("Skipping update...")
-						sys.exit(0)
-				else:
-					print("User is in an active Zoom call, skipping update prompt and deferring for one hour")
-					set_deferral(3600, POLICY_EVENT)
-					sys.exit(0)
-			run_update_policy(POLICY_EVENT)
-			print("Notifying user of update complete...")
-			user_prompt(COMPLETE, bid, reopen_app=True)
-			remove_daemons(POLICY_EVENT)
+				print("Skipping update...")
+				sys.exit(0)
+		else:
+			print("User is in an active Zoom call, skipping update prompt and deferring for one hour")
+			set_deferral(3600, POLICY_EVENT_KEY)
+			sys.exit(0)
+	run_update_policy(POLICY_EVENT)
+	print("Notifying user of update complete...")
+	user_prompt(COMPLETE, running_bids[0], reopen_app=True)
+	remove_daemons(POLICY_EVENT_KEY)
 
 # main
 if __name__ == "__main__":
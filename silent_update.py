@@ -27,9 +27,10 @@ MacAdmins: @matt_h
 
 # import modules
 import sys
-import subprocess
+import os
+import plistlib
 
-from Cocoa import NSRunningApplication
+from AppKit import NSRunningApplication, NSWorkspace
 
 """
 global variables:
@@ -48,12 +49,39 @@ def check_if_running(bid):
 	Use a native macOS API to determine whether or not the app is running using its bundle ID
 	Return a boolean value based on the result
 	"""
-	app = NSRunningApplication.runningApplicationsWithBundleIdentifier_(bid)
-	if app:
-		return True
-	if not app:
-		return False
+	return NSRunningApplication.runningApplicationsWithBundleIdentifier_(bid).count() > 0
+
 
+def spawn(cmd):
+	"""
+	Run a command with posix_spawn and wait for it to finish, discarding its output
+	
+	Return the exit code and anything written to stderr
+	"""
+	read_fd, write_fd = os.pipe()
+	try:
+		pid = os.posix_spawn(cmd[0], cmd, os.environ, file_actions=[
+			(os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+			(os.POSIX_SPAWN_DUP2, write_fd, 2),
+		])
+	except OSError:
+		os.close(read_fd)
+		raise
+	finally:
+		os.close(write_fd)
+	with os.fdopen(read_fd, 'rb') as stderr:
+		err = stderr.read()
+	_, status = os.waitpid(pid, 0)
+	return os.waitstatus_to_exitcode(status), err
+
+def run_jamf(*args):
+	"""
+	Call the jamf binary once with the given verb and arguments
+	Return the exit code and stderr from the jamf process
+	"""
+	cmd = ["/usr/local/bin/jamf"]
+	cmd.extend(args)
+	return spawn(cmd)
 
 def run_update_policy(event):
 	"""
@@ -61,10 +89,8 @@ def run_update_policy(event):
 	The jamf binary is called to explicitly run the policy with the specified event trigger
 	If the event trigger is empty, do nothing
 	"""
-	cmd = ["/usr/local/bin/jamf", "policy", "-event", event]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	out, err = proc.communicate()
-	if proc.returncode != 0:
+	returncode, err = run_jamf("policy", "-event", event)
+	if returncode != 0:
 		print("Error: %s" % err)
 
 def check_version(bid):
@@ -73,23 +99,21 @@ def check_version(bid):
 	If they match (such as if the user already updated), exit silently
 	"""
 
-	cmd = ["/usr/bin/mdfind", "kMDItemCFBundleIdentifier", "=", bid]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	appPath, err = proc.communicate()
-
-	plistPath=appPath.decode("utf-8").strip() + "/Contents/Info.plist"
-
-	cmd = ["/usr/bin/defaults", "read", plistPath, "CFBundleVersion"]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	bundleVersion, err = proc.communicate()
+	appURL = NSWorkspace.sharedWorkspace().URLForApplicationWithBundleIdentifier_(bid)
+	if not appURL:
+		return True
 
-	bundleVersionString=bundleVersion.decode("utf-8").strip()
+	plistPath = os.path.join(appURL.path(), "Contents/Info.plist")
 
-	cmd = ["/usr/bin/defaults", "read", plistPath, "CFBundleShortVersionString"]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	bundleShortVersion, err = proc.communicate()
+	try:
+		with open(plistPath, 'rb') as plist:
+			info = plistlib.load(plist)
+	except (OSError, plistlib.InvalidFileException) as err:
+		print("Unable to read app Info.plist: " + str(err))
+		return True
 
-	bundleShortVersionString=bundleShortVersion.decode("utf-8").strip()
+	bundleVersionString = str(info.get('CFBundleVersion', ''))
+	bundleShortVersionString = str(info.get('CFBundleShortVersionString', ''))
 
 	if VERSION != bundleVersionString and VERSION != bundleShortVersionString:
 		return True
@@ -100,25 +124,23 @@ def run_recon():
 	"""
 	Update inventory to jamf
 	"""
-	cmd = ["/usr/local/bin/jamf", "recon"]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-	out, err = proc.communicate()
+	run_jamf("recon")
 
 def main():
 	"""
-	For each bundle ID, check if it's running or not
+	Check whether any of the bundle IDs are running, stopping at the first one found
 	If running, exit silently
+	If any bundle ID is already at the new version, update inventory and exit
 	Otherwise, call the update policy to update the app
 	"""
-	for app in APPS:
-		if check_if_running(app):
-			sys.exit(0)
+	if any(check_if_running(app) for app in APPS):
+		sys.exit(0)
+
+	if all(check_version(app) for app in APPS):
+		run_update_policy(POLICY)
 	else:
-		if check_version(app):
-			run_update_policy(POLICY)
-		else:
-			run_recon()
-			sys.exit(0)
+		run_recon()
+		sys.exit(0)
 
 
 # run the main